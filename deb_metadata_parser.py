@@ -7,44 +7,126 @@ class DebMetadataParser:
     """Debian package metadata parser."""
 
     @staticmethod
-    def parse_control_paragraphs(text: str) -> dict:
-        """Parse control paragraphs from Debian package metadata.
+    def _iter_lines(text: str):
+        """Iterate over lines of a string without materializing them all.
 
         Parameters
         ----------
         text : str
             The control file content.
 
+        Returns
+        ------
+        Iterator[str]
+            One line at a time, without the trailing newline.
+        """
+        # splitlinesで全行を一括生成せず、findで改行位置を走査して
+        # 1行ずつスライスする(巨大なPackagesでの割り当てを抑える)
+        start = 0
+        length = len(text)
+        while start <= length:
+            pos = text.find("\n", start)
+            if pos == -1:
+                yield text[start:]
+                return
+            yield text[start:pos]
+            start = pos + 1
+
+    @staticmethod
+    def parse_control_paragraphs(lines) -> dict:
+        """Parse control paragraphs from Debian package metadata.
+
+        Parameters
+        ----------
+        lines : str or Iterable[str]
+            The control file content, or an iterable of its lines
+            (e.g. a text stream over the decompressing reader).
+
         Returns
         ------
         dict
             A dictionary representing a control paragraph.
         """
+        if isinstance(lines, str):
+            lines = DebMetadataParser._iter_lines(lines)
+
         paragraph = {}
         current_key = None
 
-        for line in text.splitlines():
-            if not line.strip():
+        for line in lines:
+            if not line or line.isspace():
                 if paragraph:
                     yield paragraph
                     paragraph = {}
                     current_key = None
                 continue
 
-            if line[0].isspace() and current_key:
+            if (line.startswith(" ") or line.startswith("\t")) and current_key:
                 paragraph[current_key] += " " + line.strip()
                 continue
 
-            if ":" not in line:
+            key, sep, value = line.partition(":")
+            if not sep:
                 continue
 
-            key, value = line.split(":", 1)
             current_key = key.strip()
             paragraph[current_key] = value.strip()
 
         if paragraph:
             yield paragraph
 
+    @staticmethod
+    def build_package_index(data: bytes) -> dict:
+        """Build a byte-offset index of package paragraphs.
+
+        Scans the raw Packages bytes once for paragraph boundaries and
+        ``Package:`` fields so that individual paragraphs can be decoded
+        and parsed on demand instead of parsing the whole file up front.
+
+        Parameters
+        ----------
+        data : bytes
+            The decompressed Packages file content.
+
+        Returns
+        -------
+        dict
+            Mapping of package name to ``(start, end)`` byte offsets of
+            its paragraph. The first occurrence of a name wins.
+        """
+        index = {}
+        start = 0
+        length = len(data)
+
+        while start < length:
+            # 段落先頭の空行をスキップ
+            while start < length and data[start:start + 1] == b"\n":
+                start += 1
+            if start >= length:
+                break
+            end = data.find(b"\n\n", start)
+            if end == -1:
+                end = length
+
+            # 段落内のPackage:行を探す(通常は先頭行)
+            if data.startswith(b"Package:", start):
+                name_start = start + len(b"Package:")
+            else:
+                pos = data.find(b"\nPackage:", start, end)
+                name_start = pos + len(b"\nPackage:") if pos != -1 else -1
+            if name_start != -1:
+                line_end = data.find(b"\n", name_start, end)
+                if line_end == -1:
+                    line_end = end
+                name = data[name_start:line_end].strip().decode(
+                    "utf-8", errors="replace")
+                if name and name not in index:
+                    index[name] = (start, end)
+
+            start = end + 2
+
+        return index
+
     @staticmethod
     def parse_depends(depends_field: str) -> list:
         """Parse the Depends field from a control paragraph.
@@ -64,11 +146,9 @@ class DebMetadataParser:
 
         deps = []
         for entry in depends_field.split(","):
-            entry = entry.strip()
-            if not entry:
-                continue
-            first_alt = entry.split("|")[0].strip()
-            name = first_alt.split(" ")[0].strip()
+            # 最初の代替候補からバージョン指定を落としてパッケージ名を得る
+            first_alt = entry.partition("|")[0].strip()
+            name = first_alt.partition(" ")[0].partition("(")[0]
             if name:
                 deps.append(name)
         return deps
@@ -87,8 +167,7 @@ class DebMetadataParser:
         str
             The base URL of the repository.
         """
-        marker = "/dists/"
-        index = repo_url.find(marker)
-        if index == -1:
+        head, sep, _ = repo_url.partition("/dists/")
+        if not sep:
             return ensure_trailing_slash(repo_url)
-        return ensure_trailing_slash(repo_url[:index])
+        return ensure_trailing_slash(head)
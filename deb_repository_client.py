@@ -1,19 +1,117 @@
 import gzip
-import io
+import hashlib
+import json
+import lzma
+import os
 
 from http_client import HttpClient
-from pathlibex import ensure_trailing_slash
+from pathlibex import ensure_trailing_slash, get_data_dir
+
+try:
+    import zstandard  # type: ignore
+except ImportError:
+    zstandard = None
+
+# 128 KiBずつ読み出して伸長する(全量を一度にメモリへ載せない)
+READ_BUFFER_SIZE = 128 * 1024
 
 
 class DebRepositoryClient:
 
     def __init__(self, http_client=None):
         self._http = http_client or HttpClient()
+        self._cache_dir = get_data_dir() / "cache"
 
     def fetch_packages(self, repo_url):
         repo_url = ensure_trailing_slash(repo_url)
-        packages_url = repo_url + "Packages.gz"
-        response = self._http.get(packages_url)
-        response.raise_for_status()
-        with gzip.GzipFile(fileobj=io.BytesIO(response.content)) as handle:
-            return handle.read().decode("utf-8", errors="replace")
+        # 伸長が速い順(zst > xz > gz)に試し、無い形式は404でスキップ
+        suffixes = self._candidate_suffixes()
+        for index, suffix in enumerate(suffixes):
+            packages_url = repo_url + "Packages" + suffix
+            cache_path, meta_path = self._cache_paths(packages_url, suffix)
+            headers = self._conditional_headers(cache_path, meta_path)
+            response = self._http.get(packages_url,
+                                      stream=True,
+                                      headers=headers)
+            if response.status_code == 304 and os.path.exists(cache_path):
+                # ストリームを読まずに捨てる場合はコネクションを返却する
+                response.close()
+                return self._read_packages(cache_path, suffix)
+            if (response.status_code == 404
+                    or (response.status_code == 403
+                        and index + 1 < len(suffixes))):
+                # S3/CDN系ミラーは存在しないオブジェクトに403を返す
+                # ことがあるため、最後の候補以外は403も次の形式へ進む
+                response.close()
+                continue
+            response.raise_for_status()
+            self._store_cache(response, cache_path, meta_path)
+            return self._read_packages(cache_path, suffix)
+        raise RuntimeError(f"No Packages index found at {repo_url}")
+
+    @staticmethod
+    def _candidate_suffixes():
+        if zstandard is not None:
+            return (".zst", ".xz", ".gz")
+        return (".xz", ".gz")
+
+    def _cache_paths(self, url, suffix):
+        digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        cache_path = str(self._cache_dir / (digest + suffix))
+        meta_path = str(self._cache_dir / (digest + ".json"))
+        return cache_path, meta_path
+
+    @staticmethod
+    def _conditional_headers(cache_path, meta_path):
+        if not os.path.exists(cache_path) or not os.path.exists(meta_path):
+            return None
+        try:
+            with open(meta_path, "r", encoding="utf-8") as handle:
+                meta = json.load(handle)
+        except (OSError, json.JSONDecodeError):
+            return None
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers or None
+
+    def _store_cache(self, response, cache_path, meta_path):
+        os.makedirs(self._cache_dir, exist_ok=True)
+        temp_path = cache_path + ".tmp"
+        with open(temp_path, "wb") as handle:
+            for chunk in response.iter_content(chunk_size=READ_BUFFER_SIZE):
+                if chunk:
+                    handle.write(chunk)
+        os.replace(temp_path, cache_path)
+        meta = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        temp_meta_path = meta_path + ".tmp"
+        with open(temp_meta_path, "w", encoding="utf-8") as handle:
+            json.dump(meta, handle)
+        os.replace(temp_meta_path, meta_path)
+
+    @staticmethod
+    def _read_packages(cache_path, suffix=".gz"):
+        # strへはデコードせず生のバイト列を返す(段落は遅延デコード)
+        buf = bytearray()
+        if suffix == ".zst":
+            with open(cache_path, "rb") as raw:
+                with zstandard.ZstdDecompressor().stream_reader(raw) as handle:
+                    while True:
+                        chunk = handle.read(READ_BUFFER_SIZE)
+                        if not chunk:
+                            break
+                        buf.extend(chunk)
+            return bytes(buf)
+        opener = lzma.open if suffix == ".xz" else gzip.open
+        with opener(cache_path, "rb") as handle:
+            while True:
+                chunk = handle.read(READ_BUFFER_SIZE)
+                if not chunk:
+                    break
+                buf.extend(chunk)
+        return bytes(buf)
@@ -1,6 +1,9 @@
 #!python3
 """Debian package service implementation."""
 import os
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 from deb_metadata_parser import DebMetadataParser
 from deb_repository_client import DebRepositoryClient
@@ -46,7 +49,7 @@ class DebService(PackageService):
             meta = packages.get(name)
             if meta:
                 info = {"name": name}
-                info.update(meta)
+                info.update(self._load_package_fields(meta))
                 resolved.append(info)
         return resolved
 
@@ -69,6 +72,7 @@ class DebService(PackageService):
         None
         """
 
+        tasks = []
         for meta in resolved:
             name = meta.get("name")
             filename = meta.get("filename")
@@ -81,7 +85,18 @@ class DebService(PackageService):
                 logger.info("[deb] would download %s", url)
                 continue
             logger.info("[deb] downloading %s", url)
-            self.download_with_resume(url, dest)
+            tasks.append((url, dest))
+
+        if not tasks:
+            return
+        # HttpClientのセッションはGETに対してスレッドセーフなので共有する
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [
+                executor.submit(self.download_with_resume, url, dest)
+                for url, dest in tasks
+            ]
+        for future in futures:
+            future.result()
 
     def _collect_metadata(self, repo_urls: list) -> dict:
         """リポジトリURLのリストから、パッケージ名をキーとするパッケージ情報の辞書を収集する.
@@ -97,23 +112,67 @@ class DebService(PackageService):
         """
 
         packages = {}
-        for repo_url in repo_urls:
-            repo_url = ensure_trailing_slash(repo_url)
-            base_url = self._parser.repo_base_url(repo_url)
-            packages_data = self._repo_client.fetch_packages(repo_url)
-            for paragraph in self._parser.parse_control_paragraphs(
-                    packages_data):
-                name = paragraph.get("Package")
-                if not name or name in packages:
+        max_workers = min(8, max(1, len(repo_urls)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(self._fetch_one, repo_urls)
+        # executor.mapは投入順で結果を返すため、先勝ちルールは逐次処理と同じ
+        for base_url, buffer, index in results:
+            for name, span in index.items():
+                if name in packages:
                     continue
+                # 段落本体は解決時に必要になったものだけデコード・パースする
                 packages[name] = {
-                    "depends":
-                    self._parser.parse_depends(paragraph.get("Depends")),
-                    "filename": paragraph.get("Filename"),
                     "base_url": base_url,
+                    "_buffer": buffer,
+                    "_span": span,
                 }
         return packages
 
+    def _fetch_one(self, repo_url: str) -> tuple:
+        """単一リポジトリのPackagesメタデータを取得する.
+
+        Parameters
+        ----------
+        repo_url : str
+            リポジトリのベースURL.
+        Returns
+        -------
+        tuple
+            (ベースURL, Packagesの生バイト列, パッケージ名→バイト
+            オフセットの索引)のタプル.
+        """
+
+        repo_url = ensure_trailing_slash(repo_url)
+        # 同一ミラーの複数コンポーネントが同じベースURLを持つ場合に
+        # 文字列オブジェクトを共有させる
+        base_url = sys.intern(self._parser.repo_base_url(repo_url))
+        buffer = self._repo_client.fetch_packages(repo_url)
+        index = self._parser.build_package_index(buffer)
+        return base_url, buffer, index
+
+    def _load_package_fields(self, meta: dict) -> dict:
+        """必要になった段落だけをデコード・パースしてmetaへ展開する.
+
+        Parameters
+        ----------
+        meta : dict
+            _collect_metadataが作成したパッケージ情報の辞書.
+        Returns
+        -------
+        dict
+            filename/depends_rawが展開されたパッケージ情報の辞書.
+        """
+
+        span = meta.pop("_span", None)
+        if span is None:
+            return meta
+        buffer = meta.pop("_buffer")
+        text = buffer[span[0]:span[1]].decode("utf-8", errors="replace")
+        paragraph = next(self._parser.parse_control_paragraphs(text), {})
+        meta["filename"] = paragraph.get("Filename")
+        meta["depends_raw"] = paragraph.get("Depends")
+        return meta
+
     def _resolve_dependencies(self, package_names: list, packages: dict) -> set:
         """パッケージ名のリストから、依存関係を解決して必要なパッケージ名のセットを返す.
 
@@ -129,19 +188,25 @@ class DebService(PackageService):
             解決された必要なパッケージ名のセット.
         """
         required = set()
-        queue = list(package_names)
+        # 投入時に記録することで各名前は一度しかキューに入らない
+        queue = deque(dict.fromkeys(package_names))
+        seen = set(queue)
 
         while queue:
-            name = queue.pop(0)
-            if name in required:
-                continue
+            name = queue.popleft()
             required.add(name)
 
             meta = packages.get(name)
             if not meta:
                 continue
-            for dep in meta["depends"]:
-                if dep not in required:
+            self._load_package_fields(meta)
+            depends = meta.get("depends")
+            if depends is None:
+                depends = self._parser.parse_depends(meta.get("depends_raw"))
+                meta["depends"] = depends
+            for dep in depends:
+                if dep not in seen:
+                    seen.add(dep)
                     queue.append(dep)
 
         return required
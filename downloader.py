@@ -3,6 +3,7 @@
 # pylint: disable=W0718, C0103
 
 import argparse
+import functools
 import json
 import os
 import sys
@@ -26,19 +27,27 @@ def _load_repos_from_json(filename, default):
     return default
 
 
-DEFAULT_RPM_REPOS = _load_repos_from_json(
-    os.path.join("tools", "DEFAULT_RPM_REPOS.json"), [
-        "https://dl.rockylinux.org/pub/rocky/9/BaseOS/x86_64/os/",
-        "https://dl.rockylinux.org/pub/rocky/9/AppStream/x86_64/os/",
-        "https://dl.rockylinux.org/pub/rocky/9/CRB/x86_64/os/",
-        "https://dl.fedoraproject.org/pub/epel/9/Everything/x86_64/"
-    ])
+@functools.lru_cache(maxsize=1)
+def _get_default_rpm_repos() -> list:
+    """デフォルトのRPMリポジトリURLリストを取得（初回アクセス時に読込）."""
+    return _load_repos_from_json(
+        os.path.join("tools", "DEFAULT_RPM_REPOS.json"), [
+            "https://dl.rockylinux.org/pub/rocky/9/BaseOS/x86_64/os/",
+            "https://dl.rockylinux.org/pub/rocky/9/AppStream/x86_64/os/",
+            "https://dl.rockylinux.org/pub/rocky/9/CRB/x86_64/os/",
+            "https://dl.fedoraproject.org/pub/epel/9/Everything/x86_64/"
+        ])
+
+
+@functools.lru_cache(maxsize=1)
+def _get_default_deb_repos() -> list:
+    """デフォルトのDEBリポジトリURLリストを取得（初回アクセス時に読込）."""
+    return _load_repos_from_json(
+        os.path.join("tools", "DEFAULT_DEB_REPOS.json"), [
+            "http://ftp.jp.debian.org/debian/dists/bullseye/main/binary-amd64/",
+            "http://ftp.jp.debian.org/debian/dists/bullseye/contrib/binary-amd64/"
+        ])
 
-DEFAULT_DEB_REPOS = _load_repos_from_json(
-    os.path.join("tools", "DEFAULT_DEB_REPOS.json"), [
-        "http://ftp.jp.debian.org/debian/dists/bullseye/main/binary-amd64/",
-        "http://ftp.jp.debian.org/debian/dists/bullseye/contrib/binary-amd64/"
-    ])
 
 set_init_logfile()
 logger = generate_logger(name=__name__, debug=__debug__, filepath=__file__)
@@ -168,8 +177,8 @@ def parse_args() -> argparse.Namespace:
 def main():
     """Main entry point for the downloader script."""
     args = parse_args()
-    rpm_repos = args.rpm_repo or DEFAULT_RPM_REPOS
-    deb_repos = args.deb_repo or DEFAULT_DEB_REPOS
+    rpm_repos = args.rpm_repo or _get_default_rpm_repos()
+    deb_repos = args.deb_repo or _get_default_deb_repos()
 
     run(
         package_names=args.packages,
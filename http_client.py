@@ -1,12 +1,126 @@
 #!python3
 """HTTP client with retry mechanism."""
+import io
+import time
+
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+try:
+    import httpx  # type: ignore
+except ImportError:
+    httpx = None
+
+
+class _IterRawReader(io.RawIOBase):
+    """Adapt a byte-chunk iterator to a readable raw stream.
+
+    Gives httpx streaming responses a requests-compatible ``raw``
+    attribute usable with shutil.copyfileobj.
+    """
+
+    def __init__(self, iterator):
+        super().__init__()
+        self._iterator = iterator
+        self._leftover = b""
+        # requests互換のためのダミー属性(httpxは常にデコード済み)
+        self.decode_content = True
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if not self._leftover:
+            try:
+                chunk = next(self._iterator, None)
+            except httpx.HTTPError as error:
+                # 呼び出し側のリトライ(except OSError)に乗るよう変換する
+                raise requests.ConnectionError(str(error)) from error
+            if chunk is None:
+                return 0
+            self._leftover = chunk
+        size = min(len(buffer), len(self._leftover))
+        buffer[:size] = self._leftover[:size]
+        self._leftover = self._leftover[size:]
+        return size
+
+
+class _HttpxResponse:
+    """requests.Response-compatible wrapper around httpx.Response.
+
+    httpx例外はrequests系(RequestExceptionはOSError派生)へ変換して
+    上げるので、呼び出し側はバックエンドを意識せず同じexcept節で
+    リトライできる。
+    """
+
+    def __init__(self, response, chunk_size=64 * 1024):
+        self._response = response
+        self._chunk_size = chunk_size
+        self._raw = None
+
+    @property
+    def status_code(self) -> int:
+        return self._response.status_code
+
+    @property
+    def headers(self):
+        return self._response.headers
+
+    @property
+    def ok(self) -> bool:
+        return not self._response.is_error
+
+    @property
+    def content(self) -> bytes:
+        try:
+            return self._response.read()
+        except httpx.HTTPError as error:
+            raise requests.ConnectionError(str(error)) from error
+
+    @property
+    def text(self) -> str:
+        try:
+            self._response.read()
+        except httpx.HTTPError as error:
+            raise requests.ConnectionError(str(error)) from error
+        return self._response.text
+
+    @property
+    def raw(self):
+        if self._raw is None:
+            self._raw = _IterRawReader(
+                self._response.iter_bytes(self._chunk_size))
+        return self._raw
+
+    def raise_for_status(self):
+        try:
+            self._response.raise_for_status()
+        except httpx.HTTPStatusError as error:
+            raise requests.HTTPError(str(error), response=self) from error
+
+    def iter_content(self, chunk_size=None):
+        try:
+            yield from self._response.iter_bytes(chunk_size or self._chunk_size)
+        except httpx.HTTPError as error:
+            raise requests.ConnectionError(str(error)) from error
+
+    def close(self):
+        self._response.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
 
 class HttpClient:
-    """HTTP client with retry mechanism."""
+    """HTTP client with retry mechanism.
+
+    httpx(+h2)が利用可能な場合はHTTP/2多重化で同一ホストへの多数の
+    GETを1本のTCP接続に載せる。なければ従来のrequests+Retryを使う。
+    """
 
     def __init__(
         self,
@@ -16,11 +130,29 @@ class HttpClient:
         backoff=0.5,
         status_forcelist=None,
     ):
-        self._session = session or requests.Session()
         self._timeout = timeout
+        self._retries = retries
+        self._backoff = backoff
+        self._client = None
+        if session is None and httpx is not None:
+            try:
+                self._client = httpx.Client(
+                    http2=True,
+                    timeout=timeout,
+                    limits=httpx.Limits(max_connections=16,
+                                        max_keepalive_connections=8),
+                    transport=httpx.HTTPTransport(retries=retries, http2=True),
+                    follow_redirects=True,
+                )
+            except ImportError:
+                # h2未インストールならrequestsへフォールバック
+                self._client = None
+
+        self._session = session or requests.Session()
 
         if status_forcelist is None:
             status_forcelist = [429, 500, 502, 503, 504]
+        self._status_forcelist = frozenset(status_forcelist)
 
         retry = Retry(
             total=retries,
@@ -32,7 +164,11 @@ class HttpClient:
             allowed_methods=frozenset(["GET", "HEAD", "OPTIONS"]),
             raise_on_status=False,
         )
-        adapter = HTTPAdapter(max_retries=retry)
+        # repomd/primary/RPM本体のGETが同一ミラーに集中するため、
+        # keep-alive接続を十分な数プールして握手を使い回す
+        adapter = HTTPAdapter(pool_connections=16,
+                              pool_maxsize=32,
+                              max_retries=retry)
         self._session.mount("http://", adapter)
         self._session.mount("https://", adapter)
 
@@ -54,11 +190,56 @@ class HttpClient:
         Returns
         -------
         requests.Response
-            Response object
+            Response object (or a compatible wrapper when httpx is used)
         """
+        if self._client is not None:
+            return self._get_httpx(url, stream=stream, headers=headers)
         return self._session.get(
             url,
             stream=stream,
             headers=headers,
             timeout=self._timeout,
         )
+
+    def _get_httpx(self,
+                   url: str,
+                   stream: bool = False,
+                   headers: dict = None) -> "_HttpxResponse":
+        """GET via the httpx backend with requests-equivalent retries.
+
+        Parameters
+        ----------
+        url : str
+            url to GET
+        stream : bool, optional
+            stream the response content, by default False
+        headers : dict, optional
+            headers to include in the request, by default None
+
+        Returns
+        -------
+        _HttpxResponse
+            requests.Response-compatible wrapper
+        """
+        # HTTPTransport(retries=...)は接続エラーしか再試行しないため、
+        # requests側のRetry(status_forcelist)相当はここで自前で行う
+        response = None
+        for attempt in range(self._retries + 1):
+            request = self._client.build_request("GET", url, headers=headers)
+            try:
+                response = self._client.send(request, stream=stream)
+            except httpx.HTTPError as error:
+                # requests互換の例外(OSError派生)へ変換して上げる
+                raise requests.ConnectionError(str(error)) from error
+            if (response.status_code in self._status_forcelist
+                    and attempt < self._retries):
+                response.close()
+                time.sleep(self._backoff * (2**attempt))
+                continue
+            break
+        if not stream:
+            try:
+                response.read()
+            except httpx.HTTPError as error:
+                raise requests.ConnectionError(str(error)) from error
+        return _HttpxResponse(response)
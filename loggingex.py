@@ -16,12 +16,21 @@ from logging import (
     StreamHandler,
     getLogger,
 )
+from logging.config import dictConfig
 from logging.handlers import RotatingFileHandler
 
 from pathlibex import get_data_dir
 
 DEFAULT_CONFIG_PATH = "loggingex_config.json"
 
+LOG_FORMAT = " - ".join([
+    " %(asctime)s",
+    "%(filename)s:%(lineno)d",
+    "%(funcName)s",
+    "%(levelname)s",
+    "%(message)s",
+])
+
 LOG_LEVELS = {
     "DEBUG": DEBUG,
     "INFO": INFO,
@@ -35,6 +44,64 @@ _log_dir = get_data_dir() / "log"
 _log_dir.mkdir(parents=True, exist_ok=True)
 _log_config = {"log_dir": _log_dir}
 
+# ログファイルパスごとに共有するファイルハンドラのキャッシュ
+_file_handlers: dict[str, RotatingFileHandler] = {}
+
+# 設定ファイルのキャッシュ（パス -> (mtime, 設定辞書)）
+_config_cache: dict[str, tuple[float, dict]] = {}
+
+# dictConfigで構成済みのロガー名（generate_loggerはこれらを素通しする）
+_configured_names: set[str] = set()
+
+
+def _get_file_handler(log_filepath: str, fmt: Formatter,
+                      log_level: int) -> RotatingFileHandler:
+    """
+    ログファイルパスに対応する共有ファイルハンドラを取得.
+
+    同じファイルへのハンドラを複数生成せず、FDとフォーマッタを共有する。
+
+    Parameters
+    ----------
+    log_filepath : str
+        ログファイルのパス.
+    fmt : Formatter
+        Formatterのインスタンス.
+    log_level : int
+        ログレベル.
+
+    Returns
+    -------
+    RotatingFileHandler
+        共有されたファイルハンドラ.
+    """
+    handler = _file_handlers.get(log_filepath)
+    if handler is None:
+        handler = RotatingFileHandler(filename=log_filepath,
+                                      maxBytes=10 * 1024 * 1024,
+                                      backupCount=5,
+                                      encoding="utf-8")
+        handler.setFormatter(fmt)
+        handler.setLevel(log_level)
+        _file_handlers[log_filepath] = handler
+    return handler
+
+
+def _cleanup_file_handlers() -> None:
+    """
+    共有ファイルハンドラのクリーンアップ.
+
+    Returns
+    -------
+    None.
+    """
+    for handler in _file_handlers.values():
+        handler.close()
+    _file_handlers.clear()
+
+
+atexit.register(_cleanup_file_handlers)
+
 
 def set_log_directory() -> None:
     """
@@ -80,13 +147,7 @@ def generate_log_formatter() -> Formatter:
         Formatterのインスタンス.
 
     """
-    return Formatter(" - ".join([
-        " %(asctime)s",
-        "%(filename)s:%(lineno)d",
-        "%(funcName)s",
-        "%(levelname)s",
-        "%(message)s",
-    ]))
+    return Formatter(LOG_FORMAT)
 
 
 def generate_log_filepath(filepath: str) -> str:
@@ -134,6 +195,10 @@ def generate_logger(
     Logger
         Loggerのインスタンス.
     """
+    # set_init_logfileのdictConfigで構成済みならそのまま返す
+    if name in _configured_names:
+        return getLogger(name)
+
     ret = getLogger(name)
     fmt = generate_log_formatter()
 
@@ -160,24 +225,25 @@ def generate_logger(
     ret.setLevel(DEBUG if debug else log_level)
 
     if enabled_filehandler:
-        # ファイルハンドラー
-        filehandler = RotatingFileHandler(
-            filename=generate_log_filepath(filepath),
-            maxBytes=10 * 1024 * 1024,
-            backupCount=5,
-            encoding="utf-8")
-        filehandler.setFormatter(fmt)
-        filehandler.setLevel(log_level)
-        ret.addHandler(filehandler)
+        # ファイルハンドラー（同一ファイルへのハンドラは共有する）
+        filehandler = _get_file_handler(generate_log_filepath(filepath), fmt,
+                                        log_level)
+        if filehandler not in ret.handlers:
+            ret.addHandler(filehandler)
 
     # ストリームハンドラー
-    streamhandler = StreamHandler()
-    streamhandler.setFormatter(fmt)
-    streamhandler.setStream(stream=sys.stdout)
-    streamhandler.setLevel(log_level)
-    ret.addHandler(streamhandler)
-
-    atexit.register(cleanup_logger, ret)
+    if not any(
+            isinstance(handler, StreamHandler)
+            and not isinstance(handler, RotatingFileHandler)
+            for handler in ret.handlers):
+        streamhandler = StreamHandler()
+        streamhandler.setFormatter(fmt)
+        streamhandler.setStream(stream=sys.stdout)
+        streamhandler.setLevel(log_level)
+        ret.addHandler(streamhandler)
+
+    # 親ロガーへの伝播による二重出力を防ぐ
+    ret.propagate = False
     return ret
 
 
@@ -212,6 +278,81 @@ def set_init_logfile(config_path: str = DEFAULT_CONFIG_PATH) -> None:
             os.remove(logfilename)
             continue
 
+    # 設定全体をdictConfigで一括適用し、以降のgenerate_loggerを素通しにする
+    if config:
+        dictConfig(_build_dictconfig_schema(config))
+        for key, value in config.items():
+            getLogger(key).disabled = not value.get("enabled", True)
+            _configured_names.add(key)
+
+
+def _build_dictconfig_schema(config: dict) -> dict:
+    """
+    JSON設定をdictConfigスキーマへ変換.
+
+    Parameters
+    ----------
+    config : dict
+        load_logging_configが返す設定辞書.
+
+    Returns
+    -------
+    dict
+        logging.config.dictConfigに渡すスキーマ.
+    """
+    handlers = {
+        "console": {
+            "class": "logging.StreamHandler",
+            "stream": "ext://sys.stdout",
+            "formatter": "default",
+        },
+    }
+    loggers = {}
+    for name, module_config in config.items():
+        if not module_config.get("enabled", True):
+            loggers[name] = {
+                "level": "CRITICAL",
+                "handlers": [],
+                "propagate": False,
+            }
+            continue
+        level = module_config.get("level", "INFO").upper()
+        if level not in LOG_LEVELS:
+            level = "INFO"
+        handler_names = ["console"]
+        if module_config.get("enabled_filehandler", True):
+            handler_key = "file_" + name
+            handlers[handler_key] = {
+                "class": "logging.handlers.RotatingFileHandler",
+                "filename": generate_log_filepath(name),
+                "maxBytes": 10 * 1024 * 1024,
+                "backupCount": 5,
+                "encoding": "utf-8",
+                "formatter": "default",
+                "level": level,
+                # 使われないロガーのログファイルを開いたままにしない
+                # (Windowsでは同一ファイルへの二重ハンドルがrolloverの
+                # renameを失敗させる)ため、初回emitまでopenを遅延する
+                "delay": True,
+            }
+            handler_names.append(handler_key)
+        loggers[name] = {
+            "level": level,
+            "handlers": handler_names,
+            "propagate": False,
+        }
+    return {
+        "version": 1,
+        "disable_existing_loggers": False,
+        "formatters": {
+            "default": {
+                "format": LOG_FORMAT,
+            },
+        },
+        "handlers": handlers,
+        "loggers": loggers,
+    }
+
 
 def set_logger_handler(name: str, handler: Handler = None) -> None:
     """
@@ -273,5 +414,12 @@ def load_logging_config(config_path: str) -> dict:
     if not os.path.exists(config_path):
         # 設定ファイルが存在しない場合は空の辞書を返す
         return {}
+    # mtimeが変わらない限りキャッシュを返す（モジュール数ぶんの再読込を回避）
+    mtime = os.path.getmtime(config_path)
+    cached = _config_cache.get(config_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
     with open(config_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+        config = json.load(f)
+    _config_cache[config_path] = (mtime, config)
+    return config
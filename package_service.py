@@ -1,9 +1,12 @@
 #!python3
 """パッケージサービスの抽象基底クラスを定義するモジュール."""
 import os
+import shutil
 import sys
 from abc import ABC, abstractmethod
 
+import urllib3
+
 from http_client import HttpClient
 from loggingex import generate_logger
 
@@ -90,12 +93,13 @@ class PackageService(ABC):
         while attempt < max_retries:
             headers = {}
             mode = "wb"
-            existing = 0
-            if os.path.exists(dest):
-                existing = os.path.getsize(dest)
-                if existing > 0:
-                    headers["Range"] = f"bytes={existing}-"
-                    mode = "ab"
+            try:
+                existing = os.stat(dest).st_size
+            except OSError:
+                existing = 0
+            if existing > 0:
+                headers["Range"] = f"bytes={existing}-"
+                mode = "ab"
             try:
                 with self._http.get(
                         url,
@@ -107,14 +111,45 @@ class PackageService(ABC):
                                     dest)
                         return
                     response.raise_for_status()
+                    if existing > 0:
+                        if response.status_code == 206:
+                            # Content-Rangeの開始位置が手元のサイズと
+                            # 一致しない場合、そのボディは途中からの断片
+                            # なので書き込まずに捨て、部分ファイルを削除
+                            # してRangeなしで取り直す
+                            content_range = response.headers.get(
+                                "Content-Range", "")
+                            if not content_range.startswith(
+                                    f"bytes {existing}-"):
+                                logger.warning(
+                                    "[package_service] unexpected "
+                                    "Content-Range %r, restarting: %s",
+                                    content_range, dest)
+                                try:
+                                    os.remove(dest)
+                                except OSError:
+                                    pass
+                                continue
+                        else:
+                            # サーバーがRangeを無視して200を返した場合、
+                            # "ab"のままでは先頭からのボディを重複追記
+                            # してしまうため上書きに切り替える
+                            logger.info(
+                                "[package_service] server ignored Range, "
+                                "restarting: %s", dest)
+                            mode = "wb"
+                    # iter_contentのPythonレベルのチャンクループではなく
+                    # C実装のcopyfileobjでまとめて書き込む
+                    response.raw.decode_content = True
                     with open(dest, mode) as handle:
-                        for chunk in response.iter_content(
-                                chunk_size=chunk_size):
-                            if chunk:
-                                handle.write(chunk)
+                        shutil.copyfileobj(response.raw, handle,
+                                           length=chunk_size)
                 logger.info("[package_service] download succeeded: %s", dest)
                 return
-            except (OSError, AttributeError) as e:
+            except (OSError, AttributeError,
+                    urllib3.exceptions.HTTPError) as e:
+                # response.rawの直読みではiter_contentが行っていた例外の
+                # 変換を通らないため、urllib3の素の例外もリトライ対象にする
                 attempt += 1
                 logger.warning(
                     "[package_service] download failed (attempt %d/%d): %s",
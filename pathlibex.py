@@ -1,6 +1,7 @@
 #!python3
 """Path utilities for application and data directories."""
 
+import functools
 import os
 import platform
 import sys
@@ -22,6 +23,7 @@ def ensure_trailing_slash(url: str) -> str:
     return url if url.endswith("/") else url + "/"
 
 
+@functools.lru_cache(maxsize=1)
 def get_app_dir() -> Path:
     """アプリケーションのルートディレクトリを取得.
 
@@ -43,6 +45,7 @@ def get_app_dir() -> Path:
         return Path(__file__).parent
 
 
+@functools.lru_cache(maxsize=1)
 def get_data_dir() -> Path:
     """データディレクトリを取得 / Get data directory.
 
@@ -1,11 +1,37 @@
 #!python3
 """RPM repository client."""
 import gzip
+import hashlib
+import io
+import json
 import lzma
+import os
+import shutil
+import tempfile
 import xml.etree.ElementTree as ET
 
 from http_client import HttpClient
-from pathlibex import ensure_trailing_slash
+from pathlibex import ensure_trailing_slash, get_data_dir
+
+try:
+    from lxml import etree as LET  # type: ignore
+except ImportError:
+    LET = None
+
+try:
+    import zstandard  # type: ignore
+except ImportError:
+    zstandard = None
+
+# repomd.xmlの完全修飾タグ(ループ内で毎回組み立てない)
+DATA_TAG = "{http://linux.duke.edu/metadata/repo}data"
+LOC_TAG = "{http://linux.duke.edu/metadata/repo}location"
+
+# ストリーム伸長時の読み出しバッファサイズ
+READ_BUFFER_SIZE = 128 * 1024
+
+# この閾値まではメモリ上に保持し、超えたらディスクへ退避する
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
 
 
 class RpmRepositoryClient:
@@ -13,6 +39,7 @@ class RpmRepositoryClient:
 
     def __init__(self, http_client=None):
         self._http = http_client or HttpClient()
+        self._cache_dir = get_data_dir() / "cache"
 
     def fetch_repodata(self, repo_url):
         """Fetch repodata from a given repository URL.
@@ -24,8 +51,10 @@ class RpmRepositoryClient:
 
         Returns
         -------
-        bytes
-            Decompressed primary repodata XML content
+        tempfile.SpooledTemporaryFile
+            File-like object containing the decompressed primary repodata
+            XML, positioned at the start. Small primaries stay in memory;
+            large ones spill to disk.
 
         Raises
         ------
@@ -34,47 +63,230 @@ class RpmRepositoryClient:
         """
         repo_url = ensure_trailing_slash(repo_url)
         repomd_url = repo_url + "repodata/repomd.xml"
-        repomd_response = self._http.get(repomd_url)
+        meta_path = self._repomd_meta_path(repomd_url)
+        headers = self._conditional_headers(meta_path)
+        repomd_response = self._http.get(repomd_url, headers=headers)
+        if repomd_response.status_code == 304:
+            cached = self._cached_primary(meta_path)
+            if cached is not None:
+                return cached
+            # キャッシュが消えていた場合は無条件GETで取り直す
+            repomd_response = self._http.get(repomd_url)
         if (repomd_response.status_code == 404
                 and repo_url.rstrip("/").endswith("/os")):
             fallback_url = repo_url[:-len("os/")]
             repomd_url = fallback_url + "repodata/repomd.xml"
+            meta_path = self._repomd_meta_path(repomd_url)
             repomd_response = self._http.get(repomd_url)
             if repomd_response.ok:
                 repo_url = fallback_url
 
         repomd = repomd_response.text
-        root = ET.fromstring(repomd)
+        # repomdのチェックサムでキャッシュを引く(dnfと同じ鍵の取り方)
+        digest = hashlib.sha256(repomd.encode("utf-8")).hexdigest()
+        cache_path = str(self._cache_dir / (digest + ".primary.xml"))
+        self._store_repomd_meta(meta_path, repomd_response, digest)
+        if os.path.exists(cache_path):
+            return open(cache_path, "rb")
 
-        primary_href = None
-        for data in root.findall("{http://linux.duke.edu/metadata/repo}data"):
-            if data.get("type") == "primary":
-                primary_href = data.find(
-                    "{http://linux.duke.edu/metadata/repo}location").get("href")
-                break
+        primary_href = self._find_primary_href(repomd)
 
         if not primary_href:
             raise RuntimeError(f"Primary metadata not found for {repo_url}")
 
         primary_url = repo_url + primary_href
-        primary_blob = self._http.get(primary_url).content
-        return self._decompress_primary(primary_href, primary_blob)
+        primary_response = self._http.get(primary_url, stream=True)
+        primary_response.raise_for_status()
+        primary_response.raw.decode_content = True
+        primary = self._decompress_primary(primary_href,
+                                           primary_response.raw)
+        self._store_primary_cache(primary, cache_path)
+        primary.seek(0)
+        return primary
+
+    def _repomd_meta_path(self, repomd_url):
+        """Return the sidecar path holding validators for a repomd URL.
+
+        Parameters
+        ----------
+        repomd_url : str
+            URL of the repomd.xml
+
+        Returns
+        -------
+        str
+            Path of the JSON sidecar in the cache directory
+        """
+        digest = hashlib.sha1(repomd_url.encode("utf-8")).hexdigest()
+        return str(self._cache_dir / (digest + ".repomd.json"))
+
+    @staticmethod
+    def _conditional_headers(meta_path):
+        """Build conditional GET headers from a repomd sidecar.
+
+        Parameters
+        ----------
+        meta_path : str
+            Path of the JSON sidecar
+
+        Returns
+        -------
+        dict or None
+            If-None-Match/If-Modified-Since headers, or None
+        """
+        try:
+            with open(meta_path, "r", encoding="utf-8") as handle:
+                meta = json.load(handle)
+        except (OSError, json.JSONDecodeError):
+            return None
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers or None
+
+    def _cached_primary(self, meta_path):
+        """Open the cached decompressed primary recorded in a sidecar.
+
+        Parameters
+        ----------
+        meta_path : str
+            Path of the JSON sidecar
 
-    def _decompress_primary(self, href, blob):
+        Returns
+        -------
+        file-like or None
+            The cached primary opened for reading, or None if missing
+        """
+        try:
+            with open(meta_path, "r", encoding="utf-8") as handle:
+                meta = json.load(handle)
+        except (OSError, json.JSONDecodeError):
+            return None
+        digest = meta.get("digest")
+        if not digest:
+            return None
+        cache_path = str(self._cache_dir / (digest + ".primary.xml"))
+        if not os.path.exists(cache_path):
+            return None
+        return open(cache_path, "rb")
+
+    def _store_repomd_meta(self, meta_path, response, digest):
+        """Persist repomd validators and its primary cache key.
+
+        Parameters
+        ----------
+        meta_path : str
+            Path of the JSON sidecar
+        response : requests.Response
+            The repomd.xml response
+        digest : str
+            sha256 digest of the repomd content
+        """
+        os.makedirs(self._cache_dir, exist_ok=True)
+        meta = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "digest": digest,
+        }
+        temp_path = meta_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as handle:
+            json.dump(meta, handle)
+        os.replace(temp_path, meta_path)
+
+    def _store_primary_cache(self, primary, cache_path):
+        """Persist the decompressed primary to the cache atomically.
+
+        Parameters
+        ----------
+        primary : file-like
+            Decompressed primary repodata
+        cache_path : str
+            Destination path in the cache directory
+        """
+        os.makedirs(self._cache_dir, exist_ok=True)
+        temp_path = cache_path + ".tmp"
+        primary.seek(0)
+        with open(temp_path, "wb") as handle:
+            shutil.copyfileobj(primary, handle, READ_BUFFER_SIZE)
+        os.replace(temp_path, cache_path)
+
+    @staticmethod
+    def _find_primary_href(repomd):
+        """Find the primary metadata location in a repomd.xml document.
+
+        Parses event-driven via iterparse (lxml when available, stdlib
+        ElementTree otherwise), collects every primary* candidate, and
+        picks the cheapest compression to decompress: .zst (when the
+        zstandard module is importable), then .gz, then .xz.
+
+        Parameters
+        ----------
+        repomd : str
+            The repomd.xml content
+
+        Returns
+        -------
+        str or None
+            The href of the preferred primary metadata, or None
+        """
+        source = io.BytesIO(repomd.encode("utf-8"))
+        if LET is not None:
+            events = LET.iterparse(source,
+                                   events=("end",),
+                                   tag=DATA_TAG,
+                                   resolve_entities=False,
+                                   huge_tree=False)
+        else:
+            events = ET.iterparse(source, events=("end",))
+        candidates = {}
+        plain_primary = None
+        for _, elem in events:
+            if elem.tag != DATA_TAG:
+                continue
+            data_type = elem.get("type") or ""
+            # primary_db(sqlite)等はXMLパイプラインに流せないので除外する
+            if (data_type.startswith("primary")
+                    and not data_type.endswith("_db")):
+                location = elem.find(LOC_TAG)
+                href = location.get("href") if location is not None else None
+                if href and ".xml" in href.lower():
+                    suffix = href.lower().rpartition(".")[2]
+                    candidates.setdefault("." + suffix, href)
+                    if data_type == "primary" and plain_primary is None:
+                        plain_primary = href
+            elem.clear()
+
+        # 伸長コストの安い順に選ぶ
+        if zstandard is not None:
+            preference = (".zst", ".gz", ".xz")
+        else:
+            preference = (".gz", ".xz")
+        for suffix in preference:
+            if suffix in candidates:
+                return candidates[suffix]
+        return plain_primary
+
+    def _decompress_primary(self, href, raw):
         """Decompress primary repodata based on file extension.
 
+        Streams the compressed body through the decompressor into a
+        spooled temporary file so neither the compressed nor the
+        decompressed primary is ever fully buffered in memory.
+
         Parameters
         ----------
         href : str
             The href of the primary repodata file
 
-        blob : bytes
-            Compressed primary repodata content
+        raw : file-like
+            Stream of the compressed primary repodata content
 
         Returns
         -------
-        bytes
-            Decompressed primary repodata content
+        tempfile.SpooledTemporaryFile
+            Decompressed primary repodata, positioned at the start
 
         Raises
         ------
@@ -85,15 +297,19 @@ class RpmRepositoryClient:
         """
         href = href.lower()
         if href.endswith(".gz"):
-            return gzip.decompress(blob)
-        if href.endswith(".xz"):
-            return lzma.decompress(blob)
-        if href.endswith(".zst"):
-            try:
-                import zstandard  # type: ignore
-            except ImportError as exc:
+            reader = gzip.GzipFile(fileobj=raw)
+        elif href.endswith(".xz"):
+            reader = lzma.LZMAFile(raw)
+        elif href.endswith(".zst"):
+            if zstandard is None:
                 raise RuntimeError(
-                    "zstandard is required to read .zst repodata") from exc
-            return zstandard.ZstdDecompressor().decompress(blob)
+                    "zstandard is required to read .zst repodata")
+            reader = zstandard.ZstdDecompressor().stream_reader(raw)
+        else:
+            raise RuntimeError(f"Unsupported repodata compression: {href}")
 
-        raise RuntimeError(f"Unsupported repodata compression: {href}")
+        spooled = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        with reader:
+            shutil.copyfileobj(reader, spooled, READ_BUFFER_SIZE)
+        spooled.seek(0)
+        return spooled
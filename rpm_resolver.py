@@ -1,22 +1,83 @@
 #!python3
 """RPM package resolver implementation."""
 import atexit
-import gc
 import os
 import shutil
 import subprocess
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 
 import solv
 
+# repo2solvのstdin対応を実測するための最小のprimaryメタデータ
+_EMPTY_PRIMARY_XML = (
+    b'<?xml version="1.0" encoding="UTF-8"?>\n'
+    b'<metadata xmlns="http://linux.duke.edu/metadata/common" packages="0"/>\n')
+
 
 class RpmResolver:
     """RPM package resolver implementation."""
 
     def __init__(self):
         self._temp_paths = []
+        # repo2solv/rpmmd2solvの探索結果のキャッシュ(PATH走査は1回だけ)
+        self._tool_paths = {}
+        # repo2solvが"-"(stdin/stdout)を受けるかの実測結果(None=未判定)
+        self._repo2solv_stdin = None
         atexit.register(self._cleanup_temp_paths)
 
+    def _find_tool(self, name: str) -> str:
+        """Locate a helper binary in PATH or tools/bin, with caching.
+
+        Parameters
+        ----------
+        name : str
+            Base name of the helper binary (e.g. "repo2solv").
+
+        Returns
+        -------
+        str or None
+            Resolved path, or None when the binary is unavailable.
+        """
+        if name in self._tool_paths:
+            return self._tool_paths[name]
+        path = shutil.which(name)
+        if not path:
+            local_path = os.path.join(
+                os.path.dirname(os.path.abspath(__file__)),
+                "tools",
+                "bin",
+                name + ".exe",
+            )
+            if os.path.exists(local_path):
+                path = local_path
+        self._tool_paths[name] = path
+        return path
+
+    def _repo2solv_accepts_stdin(self, repo2solv: str) -> bool:
+        """Check once whether repo2solv can pipe via "-".
+
+        Parameters
+        ----------
+        repo2solv : str
+            Path of the repo2solv binary.
+
+        Returns
+        -------
+        bool
+            True when "-o - -" reads stdin and writes the solv to stdout.
+        """
+        if self._repo2solv_stdin is None:
+            probe = subprocess.run(
+                [repo2solv, "-o", "-", "-"],
+                input=_EMPTY_PRIMARY_XML,
+                capture_output=True,
+                check=False,
+            )
+            self._repo2solv_stdin = (probe.returncode == 0
+                                     and bool(probe.stdout))
+        return self._repo2solv_stdin
+
     def _cleanup_temp_paths(self):
         for path in self._temp_paths:
             try:
@@ -24,64 +85,111 @@ class RpmResolver:
             except OSError:
                 pass
 
-    def _add_rpmmd_repo(self, repo: solv.Repo, primary_xml: bytes) -> None:
+    @staticmethod
+    def _write_primary(handle, primary_xml) -> None:
+        """Write primary XML metadata to an open binary file.
+
+        Parameters
+        ----------
+        handle : file-like
+            Destination opened for binary writing.
+        primary_xml : bytes or file-like
+            RPM repository primary XML metadata.
+        """
+        if isinstance(primary_xml, (bytes, bytearray)):
+            handle.write(primary_xml)
+            return
+        primary_xml.seek(0)
+        shutil.copyfileobj(primary_xml, handle)
+
+    @staticmethod
+    def _primary_bytes(primary_xml) -> bytes:
+        """Return primary XML metadata as bytes.
+
+        Parameters
+        ----------
+        primary_xml : bytes or file-like
+            RPM repository primary XML metadata.
+
+        Returns
+        -------
+        bytes
+            The metadata content.
+        """
+        if isinstance(primary_xml, (bytes, bytearray)):
+            return bytes(primary_xml)
+        primary_xml.seek(0)
+        return primary_xml.read()
+
+    def _add_rpmmd_repo(self, repo: solv.Repo, primary_xml) -> None:
         """Add RPM metadata to the given repository.
 
         Parameters
         ----------
         repo : solv.Repo
             RPM repository object.
-        primary_xml : bytes
+        primary_xml : bytes or file-like
             RPM repository primary XML metadata.
         """
+        if (hasattr(repo, "add_rpmmd") and hasattr(solv, "xfopen_buffer")
+                and hasattr(solv, "Repo_add_rpmmd")):
+            # バッファから直接パースできればtempファイルの書き戻しが不要
+            data = self._primary_bytes(primary_xml)
+            try:
+                try:
+                    fp = solv.xfopen_buffer(data, len(data))
+                except TypeError:
+                    fp = solv.xfopen_buffer(data)
+                repo.add_rpmmd(fp, None)
+                del fp
+                return
+            except (AttributeError, TypeError, RuntimeError):
+                pass
+
         if (hasattr(repo, "add_rpmmd") and hasattr(solv, "xfopen")
                 and hasattr(solv, "Repo_add_rpmmd")):
             with tempfile.NamedTemporaryFile(delete=False) as handle:
-                handle.write(primary_xml)
+                self._write_primary(handle, primary_xml)
                 temp_path = handle.name
             try:
                 fp = solv.xfopen(temp_path, "r")
                 repo.add_rpmmd(fp, None)
+                # 参照カウントが落ちた時点でlibsolvがハンドルを閉じる
                 del fp
-                gc.collect()
                 self._temp_paths.append(temp_path)
                 return
             except (AttributeError, TypeError, RuntimeError):
                 if os.path.exists(temp_path):
                     os.remove(temp_path)
 
-        repo2solv = shutil.which("repo2solv")
-        rpmmd2solv = shutil.which("rpmmd2solv")
-        if not repo2solv:
-            local_repo2solv = os.path.join(
-                os.path.dirname(os.path.abspath(__file__)),
-                "tools",
-                "bin",
-                "repo2solv.exe",
-            )
-            if os.path.exists(local_repo2solv):
-                repo2solv = local_repo2solv
-        if not rpmmd2solv:
-            local_rpmmd2solv = os.path.join(
-                os.path.dirname(os.path.abspath(__file__)),
-                "tools",
-                "bin",
-                "rpmmd2solv.exe",
-            )
-            if os.path.exists(local_rpmmd2solv):
-                rpmmd2solv = local_rpmmd2solv
+        repo2solv = self._find_tool("repo2solv")
+        rpmmd2solv = self._find_tool("rpmmd2solv")
         if not repo2solv and not rpmmd2solv:
             raise RuntimeError(
                 "repo.add_rpmmd is not available; repo2solv or rpmmd2solv is "
                 "required in PATH or tools/bin")
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            primary_path = os.path.join(temp_dir, "primary.xml")
-            solv_path = os.path.join(temp_dir, "primary.solv")
-            with open(primary_path, "wb") as handle:
-                handle.write(primary_xml)
-
-            if repo2solv:
+        data = self._primary_bytes(primary_xml)
+        if repo2solv:
+            # "-"(stdin/stdout)対応は版によるため、最小メタデータで
+            # 一度だけ実測してから全量をパイプする。成功すれば
+            # primary.xmlと.solvのディスク往復が丸ごと不要
+            if self._repo2solv_accepts_stdin(repo2solv):
+                result = subprocess.run(
+                    [repo2solv, "-o", "-", "-"],
+                    input=data,
+                    capture_output=True,
+                    check=False,
+                )
+                if result.returncode == 0 and result.stdout:
+                    self._add_solv_bytes(repo, result.stdout, "repo2solv")
+                    return
+            # stdin非対応のrepo2solvはファイル引数しか受け付けない
+            with tempfile.TemporaryDirectory() as temp_dir:
+                primary_path = os.path.join(temp_dir, "primary.xml")
+                solv_path = os.path.join(temp_dir, "primary.solv")
+                with open(primary_path, "wb") as handle:
+                    handle.write(data)
                 result = subprocess.run(
                     [repo2solv, "-o", solv_path, primary_path],
                     capture_output=True,
@@ -94,31 +202,22 @@ class RpmResolver:
                         f"{result.stdout.strip()} {result.stderr.strip()}")
 
                 self._add_solv_file(repo, solv_path, "repo2solv")
-            else:
-                result = subprocess.run(
-                    [rpmmd2solv],
-                    input=primary_xml,
-                    capture_output=True,
-                    check=False,
-                )
-                if result.returncode != 0:
-                    raise RuntimeError("rpmmd2solv failed: "
-                                       f"{result.stdout.decode().strip()} "
-                                       f"{result.stderr.decode().strip()}")
-                if os.getenv("RPM_DEBUG") == "1":
-                    print("[rpm] rpmmd2solv output bytes: "
-                          f"{len(result.stdout)}")
-                with tempfile.NamedTemporaryFile(delete=False) as handle:
-                    handle.write(result.stdout)
-                    solv_temp_path = handle.name
-                try:
-                    self._add_solv_file(repo, solv_temp_path, "rpmmd2solv")
-                finally:
-                    if os.path.exists(solv_temp_path):
-                        if os.name == "nt":
-                            self._temp_paths.append(solv_temp_path)
-                        else:
-                            os.remove(solv_temp_path)
+            return
+
+        result = subprocess.run(
+            [rpmmd2solv],
+            input=data,
+            capture_output=True,
+            check=False,
+        )
+        if result.returncode != 0:
+            raise RuntimeError("rpmmd2solv failed: "
+                               f"{result.stdout.decode().strip()} "
+                               f"{result.stderr.decode().strip()}")
+        if os.getenv("RPM_DEBUG") == "1":
+            print("[rpm] rpmmd2solv output bytes: "
+                  f"{len(result.stdout)}")
+        self._add_solv_bytes(repo, result.stdout, "rpmmd2solv")
 
     def load_pool(self, primary_xml_list: list, arch: str = None) -> solv.Pool:
         """Load RPM package pool from primary XML metadata.
@@ -126,7 +225,8 @@ class RpmResolver:
         Parameters
         ----------
         primary_xml_list : list
-            List of tuples (repo_name, primary_xml_bytes).
+            List of tuples (repo_name, primary_xml). The metadata may be
+            bytes or a file-like object.
         arch : str, optional
             Target architecture, by default None
 
@@ -141,8 +241,28 @@ class RpmResolver:
         if arch and hasattr(pool, "setarch"):
             pool.setarch(arch)
 
-        for name, primary_xml in primary_xml_list:
+        # 複数リポジトリはワーカスレッドで独立した.solvキャッシュへ変換し、
+        # 本命のpoolには安価なadd_solvだけを直列に行う(dnf5と同じ形)
+        cache_paths = [None] * len(primary_xml_list)
+        if len(primary_xml_list) > 1:
+            max_workers = min(len(primary_xml_list), os.cpu_count() or 1)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                cache_paths = list(
+                    executor.map(self._build_solv_cache,
+                                 (xml for _, xml in primary_xml_list)))
+
+        for (name, primary_xml), cache_path in zip(primary_xml_list,
+                                                   cache_paths):
             repo = pool.add_repo(name)
+            if cache_path:
+                try:
+                    self._add_solv_file(repo, cache_path, "prebuilt cache")
+                finally:
+                    try:
+                        os.remove(cache_path)
+                    except OSError:
+                        self._temp_paths.append(cache_path)
+                continue
             self._add_rpmmd_repo(repo, primary_xml)
 
         if hasattr(pool, "create_whatprovides"):
@@ -151,6 +271,48 @@ class RpmResolver:
             pool.createwhatprovides()
         return pool
 
+    def _build_solv_cache(self, primary_xml) -> str:
+        """Convert primary metadata to a .solv cache in an isolated pool.
+
+        Runs on a worker thread; the temporary pool shares no state with
+        the final one, so conversions for different repos can proceed
+        concurrently.
+
+        Parameters
+        ----------
+        primary_xml : bytes or file-like
+            RPM repository primary XML metadata.
+
+        Returns
+        -------
+        str or None
+            Path to the written .solv file, or None when serialization is
+            unavailable and the caller should load the metadata directly.
+        """
+        if not hasattr(solv, "xfopen"):
+            return None
+        solv_path = None
+        try:
+            temp_pool = solv.Pool()
+            repo = temp_pool.add_repo("cache")
+            self._add_rpmmd_repo(repo, primary_xml)
+            if not hasattr(repo, "write"):
+                return None
+            with tempfile.NamedTemporaryFile(delete=False,
+                                             suffix=".solv") as handle:
+                solv_path = handle.name
+            fp = solv.xfopen(solv_path, "w")
+            repo.write(fp)
+            del fp
+            return solv_path
+        except (AttributeError, TypeError, RuntimeError, OSError):
+            if solv_path and os.path.exists(solv_path):
+                try:
+                    os.remove(solv_path)
+                except OSError:
+                    pass
+            return None
+
     def resolve(self, pool: solv.Pool, package_names: list) -> list:
         """Resolve RPM packages from the pool.
 
@@ -166,17 +328,31 @@ class RpmResolver:
         list
             List of resolved package objects.
         """
-        jobs = []
+        selections = []
         for name in package_names:
+            # 名前ごとのselectは存在チェックとエラー報告のために残す
             selection = pool.select(name, solv.Selection.SELECTION_NAME)
             if not selection or selection.isempty():
                 raise RuntimeError(f"RPM package not found: {name}")
-            if hasattr(selection, "jobs"):
-                jobs.extend(selection.jobs(solv.Job.SOLVER_INSTALL))
-            elif hasattr(pool, "Job"):
-                jobs.append(pool.Job(solv.Job.SOLVER_INSTALL, selection))
-            else:
-                jobs.append(solv.Job(pool, solv.Job.SOLVER_INSTALL, selection))
+            selections.append(selection)
+
+        jobs = []
+        if (selections and hasattr(selections[0], "add")
+                and hasattr(selections[0], "jobs")):
+            # 1つのSelectionへ束ねてジョブ化はまとめて一度だけ行う
+            combined = selections[0]
+            for selection in selections[1:]:
+                combined.add(selection)
+            jobs = combined.jobs(solv.Job.SOLVER_INSTALL)
+        else:
+            for selection in selections:
+                if hasattr(selection, "jobs"):
+                    jobs.extend(selection.jobs(solv.Job.SOLVER_INSTALL))
+                elif hasattr(pool, "Job"):
+                    jobs.append(pool.Job(solv.Job.SOLVER_INSTALL, selection))
+                else:
+                    jobs.append(
+                        solv.Job(pool, solv.Job.SOLVER_INSTALL, selection))
 
         solver = pool.Solver()
         if hasattr(solver, "set_flag") and hasattr(solver,
@@ -218,22 +394,31 @@ class RpmResolver:
             if not selection or selection.isempty():
                 results[name] = []
                 continue
+            # dep-idごとの文字列化と一致判定の結果をキャッシュし、
+            # solvable間で共有されるdepのdep2str再呼び出しを避ける
+            dep_strings = {}
+            unmatched_ids = set()
             entries = []
             for solvable in selection.solvables():
                 repo = getattr(getattr(solvable, "repo", None), "name", None)
-                provides = []
                 pool_ref = getattr(solvable, "pool", None)
                 if not pool_ref:
                     repo_ref = getattr(solvable, "repo", None)
                     pool_ref = getattr(repo_ref, "pool", None)
+                provides_match = []
                 if pool_ref and hasattr(solvable, "lookup_deparray"):
                     dep_ids = solvable.lookup_deparray(solv.SOLVABLE_PROVIDES)
-                    if dep_ids:
-                        provides = [
-                            self._dep_to_str(pool_ref, dep_id)
-                            for dep_id in dep_ids
-                        ]
-                provides_match = [value for value in provides if name in value]
+                    for dep_id in dep_ids or ():
+                        if dep_id in unmatched_ids:
+                            continue
+                        value = dep_strings.get(dep_id)
+                        if value is None:
+                            value = self._dep_to_str(pool_ref, dep_id)
+                            if name not in value:
+                                unmatched_ids.add(dep_id)
+                                continue
+                            dep_strings[dep_id] = value
+                        provides_match.append(value)
                 entries.append({
                     "name": getattr(solvable, "name", None),
                     "evr": getattr(solvable, "evr", None),
@@ -265,6 +450,48 @@ class RpmResolver:
         except (TypeError, ValueError):
             return str(dep_id)
 
+    def _add_solv_bytes(self, repo: solv.Repo, data: bytes,
+                        source: str) -> None:
+        """Add solv-format bytes to the repository.
+
+        Feeds the buffer straight to libsolv when xfopen_buffer is
+        available; otherwise spills it to a temporary file.
+
+        Parameters
+        ----------
+        repo : solv.Repo
+            RPM package repository object.
+        data : bytes
+            Content of a .solv file.
+        source : str
+            Source description for error reporting.
+        """
+        if hasattr(solv, "xfopen_buffer"):
+            try:
+                try:
+                    fp = solv.xfopen_buffer(data, len(data))
+                except TypeError:
+                    fp = solv.xfopen_buffer(data)
+                repo.add_solv(fp, 0)
+                del fp
+            except (AttributeError, TypeError, RuntimeError):
+                pass
+            else:
+                self._check_repo_loaded(repo, source)
+                return
+
+        with tempfile.NamedTemporaryFile(delete=False) as handle:
+            handle.write(data)
+            solv_temp_path = handle.name
+        try:
+            self._add_solv_file(repo, solv_temp_path, source)
+        finally:
+            if os.path.exists(solv_temp_path):
+                if os.name == "nt":
+                    self._temp_paths.append(solv_temp_path)
+                else:
+                    os.remove(solv_temp_path)
+
     def _add_solv_file(self, repo: solv.Repo, solv_path: str,
                        source: str) -> None:
         """Add a solv file to the repository.
@@ -286,11 +513,23 @@ class RpmResolver:
                 repo.add_solv(fp, 0)
             finally:
                 if fp is not None:
+                    # delで参照カウントが0になりハンドルは閉じられる
                     del fp
-                    gc.collect()
         else:
             repo.add_solv(solv_path, 0)
 
+        self._check_repo_loaded(repo, source)
+
+    def _check_repo_loaded(self, repo: solv.Repo, source: str) -> None:
+        """Verify that loading metadata actually produced solvables.
+
+        Parameters
+        ----------
+        repo : solv.Repo
+            RPM package repository object.
+        source : str
+            Source description for error reporting.
+        """
         if hasattr(repo, "internalize"):
             repo.internalize()
         if getattr(repo, "nsolvables", 0) == 0:
@@ -1,6 +1,8 @@
 #!python3
 """RPM package service implementation."""
+import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 import solv
 
@@ -51,12 +53,12 @@ class RpmService(PackageService):
         NotImplementedError
             サブクラスで実装されていない場合に発生.
         """
-        primary_xml_list = []
-        for repo_url in repo_urls:
-            logger.info("[rpm] fetching repodata from %s", repo_url)
-            primary_xml = self._repo_client.fetch_repodata(repo_url)
-            primary_xml_list.append(
-                (ensure_trailing_slash(repo_url), primary_xml))
+        # repomd+primaryの2往復×リポジトリ数を並列化する
+        # (executor.mapは投入順で結果を返す)
+        max_workers = min(8, max(1, len(repo_urls)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            primary_xml_list = list(
+                executor.map(self._fetch_repodata_one, repo_urls))
 
         pool = self._resolver.load_pool(primary_xml_list, arch=arch)
         repos = pool.repos() if callable(pool.repos) else pool.repos
@@ -77,6 +79,10 @@ class RpmService(PackageService):
             return []
 
         resolved_objs = self._resolver.resolve(pool, package_names)
+        # 1パッケージ1回のロギング呼び出しを避けるため、INFO有効時のみ
+        # 行を溜めて最後に1回で出力する
+        info_enabled = logger.isEnabledFor(logging.INFO)
+        resolved_lines = []
         # C拡張依存を排除したdictリストに変換
         resolved = []
         for pkg in resolved_objs:
@@ -113,10 +119,31 @@ class RpmService(PackageService):
                     pass
             info["location"] = location
             resolved.append(info)
-            logger.info("[rpm] resolved package: %s %s %s @ %s", info["name"],
-                        info["evr"], info["arch"], info["repo"])
+            if info_enabled:
+                resolved_lines.append("[rpm] resolved package: %s %s %s @ %s" %
+                                      (info["name"], info["evr"], info["arch"],
+                                       info["repo"]))
+        if resolved_lines:
+            logger.info("\n".join(resolved_lines))
         return resolved
 
+    def _fetch_repodata_one(self, repo_url: str) -> tuple:
+        """Fetch repodata for a single repository.
+
+        Parameters
+        ----------
+        repo_url : str
+            Repository base URL.
+
+        Returns
+        -------
+        tuple
+            Tuple of (base URL with trailing slash, primary metadata).
+        """
+        logger.info("[rpm] fetching repodata from %s", repo_url)
+        primary_xml = self._repo_client.fetch_repodata(repo_url)
+        return ensure_trailing_slash(repo_url), primary_xml
+
     def download(self,
                  resolved: list,
                  output_dir: str,
@@ -133,9 +160,14 @@ class RpmService(PackageService):
             If True, do not perform actual download, by default False
         """
         logger.info("[rpm] preparing to download packages")
+        # ループ本体は辞書の組み立てだけなので、INFO無効時は
+        # ロギング呼び出し自体をスキップする
+        info_enabled = logger.isEnabledFor(logging.INFO)
         missing_locations = 0
+        tasks = []
         for pkg in resolved:
-            logger.info("[rpm] download package %s", pkg["name"])
+            if info_enabled:
+                logger.info("[rpm] download package %s", pkg["name"])
             repo_url = ensure_trailing_slash(pkg["repo"])
             location = pkg["location"]
             if not location:
@@ -148,8 +180,21 @@ class RpmService(PackageService):
             if dry_run:
                 logger.info("[rpm] would download %s", url)
                 continue
-            logger.info("[rpm] downloading %s", url)
-            self.download_with_resume(url, dest)
+            if info_enabled:
+                logger.info("[rpm] downloading %s", url)
+            tasks.append((url, dest))
 
         if missing_locations:
             logger.info("[rpm] missing location total: %d", missing_locations)
+
+        if not tasks:
+            return
+        # URLと保存先の組み立て(と欠損カウント)は直列に済ませてあるので、
+        # ワーカはネットワークI/Oだけを担う
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [
+                executor.submit(self.download_with_resume, url, dest)
+                for url, dest in tasks
+            ]
+        for future in futures:
+            future.result()